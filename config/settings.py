@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -16,6 +17,9 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
     FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     
+    # Server Configuration
+    SERVER_THREADS = int(os.getenv('SERVER_THREADS', '16'))
+    
     # Database Configuration
     DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///youtube_search.db')
     
@@ -32,8 +36,11 @@ class Config:
     LOG_FILE = os.getenv('LOG_FILE', 'logs/app.log')
     
     # Cache Configuration
-    CACHE_TIMEOUT = 3600  # 1 hour in seconds
+    CACHE_TIMEOUT = 600  # 10 minutes, matching the API client's search response cache
+    RECOMMENDATION_CACHE_TIMEOUT = 300  # 5 minutes in seconds
     ENABLE_CACHING = True
+    CACHE_DIR = os.getenv('CACHE_DIR', '.cache/search')
+    CACHE_SIZE_LIMIT = 1 << 30  # 1 GiB
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -45,6 +52,11 @@ class ProductionConfig(Config):
     FLASK_DEBUG = False
     LOG_LEVEL = 'WARNING'
 
+@lru_cache(maxsize=None)
+def get_config_name():
+    """Get the configuration name from FLASK_ENV, read once per process"""
+    return os.getenv('FLASK_ENV', 'development')
+
 # Configuration mapping
 config = {
     'development': DevelopmentConfig,
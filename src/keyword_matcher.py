@@ -0,0 +1,55 @@
+"""
+Keyword Matcher
+Multi-keyword substring matching backed by an Aho-Corasick automaton
+"""
+
+import ahocorasick
+
+class KeywordMatcher:
+    """Finds which of a fixed set of keywords occur in text in a single scan"""
+    
+    def __init__(self, keywords):
+        """Build the automaton once from keywords (matched case-insensitively)"""
+        self.keywords = list(dict.fromkeys(keyword.casefold() for keyword in keywords if keyword))
+        self._automaton = None
+        
+        if self.keywords:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+    
+    def __bool__(self):
+        return self._automaton is not None
+    
+    def find(self, *texts):
+        """
+        Find keywords occurring in any of the given texts
+        
+        Args:
+            *texts (str): Casefolded texts to scan
+        
+        Returns:
+            set: Matched keywords
+        """
+        if self._automaton is None:
+            return set()
+        
+        found = set()
+        for text in texts:
+            found.update(keyword for _, keyword in self._automaton.iter(text))
+        return found
+    
+    def matches_any(self, *texts):
+        """Check whether any keyword occurs in the given casefolded texts"""
+        if self._automaton is None:
+            return False
+        
+        for text in texts:
+            for _ in self._automaton.iter(text):
+                return True
+        return False
+    
+    def count(self, *texts):
+        """Count distinct keywords occurring in the given casefolded texts"""
+        return len(self.find(*texts))
@@ -7,107 +7,93 @@ Main application entry point
 import os
 import sys
 import logging
-from flask import Flask, request, jsonify, render_template_string
+import orjson
+from diskcache import Cache
+from flask import Flask, request, jsonify, render_template
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+from waitress import serve
 
 # Add src directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from config.settings import config
+from config.settings import config, get_config_name
 from youtube_api import YouTubeSearchClient
 from user_preferences import UserPreferenceEngine
 from search_engine import PersonalizedSearchEngine
 
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson for faster response encoding"""
+    
+    @staticmethod
+    def _default(obj):
+        """Encode types orjson does not handle natively"""
+        if isinstance(obj, (set, frozenset)):
+            return list(obj)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self._default, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping a decode
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self._default, option=orjson.OPT_NON_STR_KEYS)
+        return self._app.response_class(body, mimetype='application/json')
+
 def create_app(config_name=None):
     """Create and configure the Flask application"""
     
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     CORS(app)
     
     # Load configuration
-    config_name = config_name or os.getenv('FLASK_ENV', 'development')
+    config_name = config_name or get_config_name()
     app.config.from_object(config[config_name])
     
+    # Snapshot settings once instead of looking them up per request
+    log_level = app.config['LOG_LEVEL']
+    default_search_results = app.config['DEFAULT_SEARCH_RESULTS']
+    health_status = {
+        'status': 'healthy',
+        'version': '1.0.0',
+        'environment': config_name
+    }
+    
     # Set up logging
     logging.basicConfig(
-        level=getattr(logging, app.config['LOG_LEVEL']),
+        level=getattr(logging, log_level),
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
     logger = logging.getLogger(__name__)
     logger.info(f"Starting YouTube Search Engine in {config_name} mode")
     
+    # Disk-backed API response cache shared by all worker processes
+    response_cache = None
+    if app.config['ENABLE_CACHING']:
+        response_cache = Cache(app.config['CACHE_DIR'], size_limit=app.config['CACHE_SIZE_LIMIT'])
+    
     # Initialize components
-    youtube_client = YouTubeSearchClient(app.config['YOUTUBE_API_KEY'])
+    youtube_client = YouTubeSearchClient(app.config['YOUTUBE_API_KEY'], cache=response_cache)
     preference_engine = UserPreferenceEngine()
-    search_engine = PersonalizedSearchEngine(youtube_client, preference_engine)
+    
+    search_engine = PersonalizedSearchEngine(
+        youtube_client,
+        preference_engine,
+        enable_caching=app.config['ENABLE_CACHING'],
+        cache_timeout=app.config['CACHE_TIMEOUT'],
+        recommendation_cache_timeout=app.config['RECOMMENDATION_CACHE_TIMEOUT']
+    )
     
     @app.route('/')
     def index():
         """Main search interface"""
-        html_template = '''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>YouTube Video Search Engine</title>
-            <style>
-                body { font-family: Arial, sans-serif; max-width: 800px; margin: 0 auto; padding: 20px; }
-                .search-box { width: 100%; padding: 10px; margin: 10px 0; font-size: 16px; }
-                .search-btn { padding: 10px 20px; background: #ff0000; color: white; border: none; cursor: pointer; }
-                .video-result { border: 1px solid #ddd; margin: 10px 0; padding: 15px; }
-                .video-title { font-weight: bold; color: #1a0dab; }
-                .video-channel { color: #666; }
-                .video-description { margin-top: 5px; }
-            </style>
-        </head>
-        <body>
-            <h1>🎥 YouTube Video Search Engine</h1>
-            <p>Personalized video search based on your preferences</p>
-            
-            <form id="searchForm">
-                <input type="text" id="searchQuery" class="search-box" placeholder="Enter your search query..." required>
-                <button type="submit" class="search-btn">Search Videos</button>
-            </form>
-            
-            <div id="results"></div>
-            
-            <script>
-                document.getElementById('searchForm').onsubmit = function(e) {
-                    e.preventDefault();
-                    const query = document.getElementById('searchQuery').value;
-                    searchVideos(query);
-                };
-                
-                function searchVideos(query) {
-                    fetch('/api/search?q=' + encodeURIComponent(query))
-                        .then(response => response.json())
-                        .then(data => displayResults(data))
-                        .catch(error => console.error('Error:', error));
-                }
-                
-                function displayResults(data) {
-                    const resultsDiv = document.getElementById('results');
-                    if (data.error) {
-                        resultsDiv.innerHTML = '<p>Error: ' + data.error + '</p>';
-                        return;
-                    }
-                    
-                    let html = '<h2>Search Results (' + data.videos.length + ' videos found)</h2>';
-                    data.videos.forEach(video => {
-                        html += '<div class="video-result">';
-                        html += '<div class="video-title">' + video.title + '</div>';
-                        html += '<div class="video-channel">by ' + video.channel + '</div>';
-                        html += '<div class="video-description">' + (video.description || '') + '</div>';
-                        html += '<a href="https://youtube.com/watch?v=' + video.video_id + '" target="_blank">Watch on YouTube</a>';
-                        html += '</div>';
-                    });
-                    resultsDiv.innerHTML = html;
-                }
-            </script>
-        </body>
-        </html>
-        '''
-        return render_template_string(html_template)
+        return render_template('index.html')
     
     @app.route('/api/search')
     def api_search():
@@ -118,7 +104,7 @@ def create_app(config_name=None):
                 return jsonify({'error': 'Search query is required'}), 400
             
             # Perform personalized search
-            results = search_engine.search(query)
+            results = search_engine.search(query, default_search_results)
             
             return jsonify({
                 'query': query,
@@ -149,11 +135,7 @@ def create_app(config_name=None):
     @app.route('/health')
     def health_check():
         """Health check endpoint"""
-        return jsonify({
-            'status': 'healthy',
-            'version': '1.0.0',
-            'environment': config_name
-        })
+        return jsonify(health_status)
     
     return app
 
@@ -165,11 +147,20 @@ def main():
     os.makedirs('logs', exist_ok=True)
     
     # Run the application
-    app.run(
-        host='0.0.0.0',
-        port=5000,
-        debug=app.config['FLASK_DEBUG']
-    )
+    if app.config['FLASK_DEBUG']:
+        app.run(
+            host='0.0.0.0',
+            port=5000,
+            debug=True
+        )
+    else:
+        # Threaded production server; request handling is I/O bound
+        serve(
+            app,
+            host='0.0.0.0',
+            port=5000,
+            threads=app.config['SERVER_THREADS']
+        )
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
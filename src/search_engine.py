@@ -3,19 +3,80 @@ Personalized Search Engine
 Combines YouTube API with user preferences for personalized search results
 """
 
+import copy
 import logging
-from datetime import datetime, timedelta
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from heapq import nlargest
+from math import log10
+from operator import itemgetter
 import re
 
+import numpy as np
+from cachetools import TTLCache
+
+from keyword_matcher import KeywordMatcher
+from youtube_api import SEARCH_FIELDS
+
 logger = logging.getLogger(__name__)
 
+# Batches at least this large are scored with NumPy instead of per-video Python
+_VECTORIZE_MIN_BATCH = 20
+
+# Upper bound on concurrent YouTube searches issued by one fan-out
+_MAX_SEARCH_WORKERS = 8
+
+# Joins title and description into one keyword haystack; keeps multi-word
+# keywords from matching across the two fields
+_FIELD_SEPARATOR = '\x1f'
+
+# ISO 8601 video durations as returned by the YouTube API, e.g. PT1H5M30S
+_DURATION_RE = re.compile(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?')
+
+@lru_cache(maxsize=4096)
+def _duration_to_seconds(duration_str):
+    """Parse ISO 8601 duration string to seconds (memoized per string)"""
+    match = _DURATION_RE.fullmatch(duration_str)
+    if not match:
+        return 0
+    
+    hours, minutes, seconds = match.groups()
+    return ((int(hours) if hours else 0) * 3600 +
+            (int(minutes) if minutes else 0) * 60 +
+            (int(seconds) if seconds else 0))
+
+@lru_cache(maxsize=4096)
+def _parse_published_at(published_at):
+    """Parse an ISO 8601 publish timestamp (memoized per string)"""
+    return datetime.fromisoformat(published_at.replace('Z', '+00:00'))
+
+@lru_cache(maxsize=64)
+def _keyword_matcher(keywords):
+    """Build a keyword automaton once per distinct keyword tuple (matchers are read-only)"""
+    return KeywordMatcher(keywords)
+
 class PersonalizedSearchEngine:
     """Main search engine that personalizes results based on user preferences"""
     
-    def __init__(self, youtube_client, preference_engine):
+    def __init__(self, youtube_client, preference_engine, enable_caching=True,
+                 cache_timeout=600, recommendation_cache_timeout=300):
         """Initialize search engine with YouTube client and preference engine"""
         self.youtube_client = youtube_client
         self.preference_engine = preference_engine
+        self.enable_caching = enable_caching
+        self.cache_timeout = cache_timeout
+        
+        # In-process TTL caches for raw API results and recommendations
+        self._cache_lock = threading.RLock()
+        self._search_cache = TTLCache(maxsize=1024, ttl=cache_timeout)
+        self._recommendation_cache = TTLCache(maxsize=256, ttl=recommendation_cache_timeout)
+        
+        # Channel name -> channel ID lookups rarely change, so keep them
+        self._channel_id_cache = {}
     
     def search(self, query, max_results=25):
         """
@@ -29,9 +90,9 @@ class PersonalizedSearchEngine:
             list: Personalized and ranked video results
         """
         try:
-            # Get raw results from YouTube API
-            raw_results = self.youtube_client.search_videos(
-                query=query,
+            # Get raw results from YouTube API (or the search cache)
+            raw_results = self._get_raw_results(
+                query,
                 max_results=min(max_results * 2, 50),  # Get more results for filtering
                 order='relevance'
             )
@@ -39,16 +100,10 @@ class PersonalizedSearchEngine:
             # Get user preferences
             preferences = self.preference_engine.get_preferences()
             
-            # Apply personalization filters
-            filtered_results = self._apply_preference_filters(raw_results, preferences)
-            
-            # Rank results based on preferences
-            ranked_results = self._rank_by_preferences(filtered_results, preferences, query)
+            # Filter and rank results against preferences in a single pass
+            final_results = self._filter_and_rank(raw_results, preferences, query, max_results)
             
-            # Limit to requested number of results
-            final_results = ranked_results[:max_results]
-            
-            # Record search in history
+            # Record search in history (buffered by the preference engine)
             self.preference_engine.record_search(
                 query=query,
                 results_count=len(final_results)
@@ -61,106 +116,254 @@ class PersonalizedSearchEngine:
             logger.error(f"Search failed: {e}")
             raise
     
+    def _get_raw_results(self, query, max_results, order='relevance', channel_id=None):
+        """Get unfiltered YouTube results, serving repeated queries from the cache"""
+        if not self.enable_caching:
+            return self._fetch_raw_results(query, max_results, order, channel_id)
+        
+        # Raw results are cached before filtering so preference changes
+        # never require invalidation
+        key = (query, max_results, order, channel_id)
+        with self._cache_lock:
+            cached = self._search_cache.get(key)
+        
+        if cached is not None:
+            logger.debug(f"Search cache hit for '{query}'")
+            return copy.deepcopy(cached)
+        
+        # The client's shared response cache may still serve this
+        results = self._fetch_raw_results(query, max_results, order, channel_id)
+        
+        # Results whose statistics lookup failed are retried on the next search
+        if getattr(results, 'statistics_complete', True):
+            with self._cache_lock:
+                self._search_cache[key] = copy.deepcopy(results)
+        
+        return results
+    
+    def _fetch_raw_results(self, query, max_results, order, channel_id):
+        """Request unfiltered search results from the YouTube API"""
+        return self.youtube_client.search_videos(
+            query=query,
+            max_results=max_results,
+            order=order,
+            fields=SEARCH_FIELDS,
+            channel_id=channel_id
+        )
+    
+    def _build_search_context(self, preferences, query):
+        """Precompute per-request preference values shared by every video"""
+        query_words = query.casefold().split()
+        query_pattern, query_implied = self._compile_query_words(query_words)
+        
+        preferred_channels = set(preferences.get('preferred_channels', []))
+        preferred_categories = set(preferences.get('preferred_categories', []))
+        preferred_matcher = _keyword_matcher(tuple(preferences.get('preferred_keywords', [])))
+        
+        return {
+            'exclude_channels': set(preferences.get('exclude_channels', [])),
+            'preferred_channels': preferred_channels,
+            'preferred_categories': preferred_categories,
+            'disliked_matcher': _keyword_matcher(tuple(preferences.get('disliked_keywords', []))),
+            'preferred_matcher': preferred_matcher,
+            # New users have no learned preferences, so their scores only
+            # depend on query, popularity and recency terms
+            'has_boost_preferences': bool(preferred_channels or preferred_categories or preferred_matcher),
+            'query_words': query_words,
+            'query_pattern': query_pattern,
+            'query_implied': query_implied,
+            'query_word_counts': Counter(query_words),
+            'min_duration': preferences.get('min_duration', 0),
+            'max_duration': preferences.get('max_duration', 7200),
+            'min_views': preferences.get('min_views', 0),
+            'max_age_days': preferences.get('max_age_days', 365),
+            'now': datetime.now(timezone.utc),
+            'video_text': {}
+        }
+    
+    def _compile_query_words(self, query_words):
+        """
+        Compile query words into a single regex scan
+        
+        Returns:
+            tuple: (pattern, implied) where pattern finds query words at every
+                title position and implied maps each match to all query words
+                it contains, or (None, {}) for an empty query
+        """
+        if not query_words:
+            return None, {}
+        
+        # A zero-width lookahead reports overlapping matches; trying longer words
+        # first means any shorter word at the same position is a substring of
+        # the reported match
+        unique_words = sorted(set(query_words), key=len, reverse=True)
+        pattern = re.compile('(?=(' + '|'.join(re.escape(word) for word in unique_words) + '))')
+        implied = {word: [other for other in unique_words if other in word] for word in unique_words}
+        
+        return pattern, implied
+    
+    def _filter_and_rank(self, videos, preferences, query, max_results):
+        """Filter and score videos in one pass, returning the top ranked results"""
+        context = self._build_search_context(preferences, query)
+        survivors = [video for video in videos if self._passes_filters(video, context)]
+        
+        return self._rank_videos(survivors, context, limit=max_results)
+    
     def _apply_preference_filters(self, videos, preferences):
         """Apply user preference filters to video results"""
-        filtered_videos = []
+        context = self._build_search_context(preferences, '')
+        return [video for video in videos if self._passes_filters(video, context)]
+    
+    def _passes_filters(self, video, context):
+        """Check whether a single video satisfies the user preference filters"""
+        # Skip if channel is in exclude list
+        exclude_channels = context['exclude_channels']
+        if exclude_channels and video.get('channel', '') in exclude_channels:
+            return False
         
-        for video in videos:
-            # Skip if channel is in exclude list
-            if video.get('channel', '') in preferences.get('exclude_channels', []):
-                continue
-            
-            # Filter by duration
-            duration = self._parse_duration(video.get('duration', 'PT0M0S'))
-            min_duration = preferences.get('min_duration', 0)
-            max_duration = preferences.get('max_duration', 7200)
-            
-            if duration < min_duration or duration > max_duration:
-                continue
-            
-            # Filter by minimum views
-            min_views = preferences.get('min_views', 0)
-            if video.get('view_count', 0) < min_views:
-                continue
-            
-            # Filter by age
-            max_age_days = preferences.get('max_age_days', 365)
-            if self._is_video_too_old(video.get('published_at', ''), max_age_days):
-                continue
-            
-            # Filter by disliked keywords
-            disliked_keywords = preferences.get('disliked_keywords', [])
-            title_lower = video.get('title', '').lower()
-            description_lower = video.get('description', '').lower()
-            
-            if any(keyword.lower() in title_lower or keyword.lower() in description_lower 
-                   for keyword in disliked_keywords):
-                continue
-            
-            filtered_videos.append(video)
+        # Filter by duration
+        duration = self._parse_duration(video.get('duration', 'PT0M0S'))
+        if duration < context['min_duration'] or duration > context['max_duration']:
+            return False
         
-        return filtered_videos
+        # Filter by minimum views
+        min_views = context['min_views']
+        if min_views and video.get('view_count', 0) < min_views:
+            return False
+        
+        # Filter by age
+        if self._is_video_too_old(video.get('published_at', ''), context['max_age_days'],
+                                  context['now']):
+            return False
+        
+        # Filter by disliked keywords
+        disliked_matcher = context['disliked_matcher']
+        if disliked_matcher and disliked_matcher.matches_any(self._video_text(video, context)[1]):
+            return False
+        
+        return True
     
     def _rank_by_preferences(self, videos, preferences, query):
         """Rank videos based on user preferences"""
-        scored_videos = []
+        context = self._build_search_context(preferences, query)
+        return self._rank_videos(videos, context)
+    
+    def _rank_videos(self, videos, context, limit=None):
+        """Order videos by descending preference score, keeping at most `limit`"""
+        if limit is None or limit > len(videos):
+            limit = len(videos)
+        if limit <= 0:
+            return []
         
-        for video in videos:
-            score = self._calculate_preference_score(video, preferences, query)
-            scored_videos.append((score, video))
+        if len(videos) >= _VECTORIZE_MIN_BATCH:
+            scores = self._score_batch(videos, context)
+            
+            if limit < len(scores):
+                # Select the top `limit` in linear time; ties at the cutoff
+                # keep the videos YouTube ranked first
+                cutoff = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+                above = np.flatnonzero(scores > cutoff)
+                at_cutoff = np.flatnonzero(scores == cutoff)[:limit - len(above)]
+                candidates = np.sort(np.concatenate((above, at_cutoff)))
+            else:
+                candidates = np.arange(len(scores))
+            
+            # Stable sort keeps YouTube's relevance order for equal scores
+            order = candidates[np.argsort(-scores[candidates], kind='stable')]
+            return [videos[i] for i in order]
+        
+        scored_videos = ((self._calculate_preference_score(video, context), video)
+                         for video in videos)
         
-        # Sort by score (descending)
-        scored_videos.sort(key=lambda x: x[0], reverse=True)
+        # Heap selection avoids sorting results beyond `limit`; like sorted(),
+        # nlargest is stable for equal scores
+        top_videos = nlargest(limit, scored_videos, key=itemgetter(0))
         
         # Return just the videos (without scores)
-        return [video for score, video in scored_videos]
+        return [video for score, video in top_videos]
     
-    def _calculate_preference_score(self, video, preferences, query):
-        """Calculate preference score for a video"""
-        score = 0.0
+    def _score_batch(self, videos, context):
+        """Calculate preference scores for a batch of videos with NumPy"""
+        n = len(videos)
         
-        # Base relevance score (YouTube's relevance ranking)
-        score += 1.0
+        # Text boosts stay in Python; the numeric terms are vectorized
+        scores = np.fromiter((self._text_score(video, context) for video in videos),
+                             dtype=np.float64, count=n)
+        views = np.fromiter((video.get('view_count', 0) for video in videos),
+                            dtype=np.float64, count=n)
+        likes = np.fromiter((video.get('like_count', 0) for video in videos),
+                            dtype=np.float64, count=n)
+        days_old = np.fromiter((self._get_video_age_days(video.get('published_at', ''), context['now'])
+                                for video in videos), dtype=np.float64, count=n)
+        durations = np.fromiter((self._parse_duration(video.get('duration', 'PT0M0S'))
+                                 for video in videos), dtype=np.float64, count=n)
         
-        # Channel preference boost
-        preferred_channels = preferences.get('preferred_channels', [])
-        if video.get('channel', '') in preferred_channels:
-            score += 2.0
+        has_views = views > 0
+        safe_views = np.maximum(views, 1)
         
-        # Category preference boost
-        preferred_categories = preferences.get('preferred_categories', [])
-        if video.get('category_id', '') in preferred_categories:
-            score += 1.5
+        scores += np.where(has_views, np.log10(safe_views) * 0.1, 0.0)
+        scores += np.where(has_views & (likes > 0), likes / safe_views * 100, 0.0)
+        scores += np.where(days_old >= 0, np.maximum(0, (30 - days_old) / 30) * 0.5, 0.0)
+        scores += np.where((durations >= context['min_duration']) &
+                           (durations <= context['max_duration']), 0.3, 0.0)
         
-        # Keyword preference boost
-        preferred_keywords = preferences.get('preferred_keywords', [])
-        title_lower = video.get('title', '').lower()
-        description_lower = video.get('description', '').lower()
+        return scores
+    
+    def _text_score(self, video, context):
+        """Calculate the base, channel, category, keyword and query score terms"""
+        score = 0.0
         
-        keyword_matches = 0
-        for keyword in preferred_keywords:
-            if (keyword.lower() in title_lower or 
-                keyword.lower() in description_lower):
-                keyword_matches += 1
+        # Base relevance score (YouTube's relevance ranking)
+        score += 1.0
         
-        score += keyword_matches * 0.5
+        title_folded, haystack = self._video_text(video, context)
         
-        # Query relevance boost
-        query_words = query.lower().split()
-        query_matches = 0
-        for word in query_words:
-            if word in title_lower:
-                query_matches += 1
+        if context['has_boost_preferences']:
+            # Channel preference boost
+            if video.get('channel', '') in context['preferred_channels']:
+                score += 2.0
+            
+            # Category preference boost
+            if video.get('category_id', '') in context['preferred_categories']:
+                score += 1.5
+            
+            # Keyword preference boost
+            keyword_matches = context['preferred_matcher'].count(haystack)
+            score += keyword_matches * 0.5
         
+        # Query relevance boost
+        query_words = context['query_words']
         if query_words:
+            matched_words = set()
+            for match in context['query_pattern'].findall(title_folded):
+                matched_words.update(context['query_implied'][match])
+            query_matches = sum(context['query_word_counts'][word] for word in matched_words)
+            
             query_relevance = query_matches / len(query_words)
             score += query_relevance * 2.0
         
+        return score
+    
+    def _video_text(self, video, context):
+        """Get a video's casefolded title and title+description haystack, once per request"""
+        key = id(video)
+        text = context['video_text'].get(key)
+        
+        if text is None:
+            title_folded = video.get('title', '').casefold()
+            haystack = title_folded + _FIELD_SEPARATOR + video.get('description', '').casefold()
+            text = context['video_text'][key] = (title_folded, haystack)
+        
+        return text
+    
+    def _calculate_preference_score(self, video, context):
+        """Calculate preference score for a video"""
+        score = self._text_score(video, context)
+        
         # View count normalization (log scale to prevent domination)
         view_count = video.get('view_count', 0)
         if view_count > 0:
-            import math
-            score += math.log10(view_count) * 0.1
+            score += log10(view_count) * 0.1
         
         # Like ratio boost (if like count available)
         like_count = video.get('like_count', 0)
@@ -169,7 +372,7 @@ class PersonalizedSearchEngine:
             score += like_ratio * 100  # Scale up since ratio is very small
         
         # Recency boost for newer videos
-        days_old = self._get_video_age_days(video.get('published_at', ''))
+        days_old = self._get_video_age_days(video.get('published_at', ''), context['now'])
         if days_old >= 0:
             # Boost newer videos (decay over 30 days)
             recency_boost = max(0, (30 - days_old) / 30) * 0.5
@@ -177,10 +380,7 @@ class PersonalizedSearchEngine:
         
         # Duration preference alignment
         duration = self._parse_duration(video.get('duration', 'PT0M0S'))
-        preferred_min = preferences.get('min_duration', 0)
-        preferred_max = preferences.get('max_duration', 7200)
-        
-        if preferred_min <= duration <= preferred_max:
+        if context['min_duration'] <= duration <= context['max_duration']:
             # Bonus for being in preferred duration range
             score += 0.3
         
@@ -188,72 +388,88 @@ class PersonalizedSearchEngine:
     
     def _parse_duration(self, duration_str):
         """Parse ISO 8601 duration string to seconds"""
-        try:
-            if not duration_str.startswith('PT'):
-                return 0
-            
-            duration_str = duration_str[2:]  # Remove 'PT'
-            total_seconds = 0
-            
-            # Parse hours
-            if 'H' in duration_str:
-                hours, duration_str = duration_str.split('H', 1)
-                total_seconds += int(hours) * 3600
-            
-            # Parse minutes
-            if 'M' in duration_str:
-                minutes, duration_str = duration_str.split('M', 1)
-                total_seconds += int(minutes) * 60
-            
-            # Parse seconds
-            if 'S' in duration_str:
-                seconds = duration_str.split('S')[0]
-                total_seconds += int(seconds)
-            
-            return total_seconds
-            
-        except Exception:
+        if not isinstance(duration_str, str):
             return 0
+        return _duration_to_seconds(duration_str)
     
-    def _is_video_too_old(self, published_at, max_age_days):
+    def _is_video_too_old(self, published_at, max_age_days, now=None):
         """Check if video is older than maximum age preference"""
         try:
             if not published_at:
                 return False
             
-            # Parse ISO format datetime
-            published_date = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-            max_age = timedelta(days=max_age_days)
-            
-            return (datetime.now(published_date.tzinfo) - published_date) > max_age
+            return self._video_age(published_at, now) > timedelta(days=max_age_days)
             
         except Exception:
             return False
     
-    def _get_video_age_days(self, published_at):
+    def _get_video_age_days(self, published_at, now=None):
         """Get video age in days"""
         try:
             if not published_at:
                 return -1
             
-            published_date = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-            age = datetime.now(published_date.tzinfo) - published_date
-            
-            return age.days
+            return self._video_age(published_at, now).days
             
         except Exception:
             return -1
     
+    def _video_age(self, published_at, now=None):
+        """Get time elapsed since publication, reusing the caller's current time if given"""
+        published_date = _parse_published_at(published_at)
+        
+        # Naive timestamps can only be compared against a naive current time
+        if now is None or published_date.tzinfo is None:
+            now = datetime.now(published_date.tzinfo)
+        
+        return now - published_date
+    
     def search_by_channel(self, channel_name, max_results=25):
         """Search videos from a specific channel"""
         try:
             query = f"channel:{channel_name}"
-            return self.search(query, max_results)
+            
+            channel_id = self._resolve_channel_id(channel_name)
+            if channel_id is None:
+                # Fall back to a keyword search if the channel can't be resolved
+                return self.search(query, max_results)
+            
+            videos = self._get_raw_results(
+                '',
+                max_results=min(max_results * 2, 50),  # Get more results for filtering
+                channel_id=channel_id
+            )
+            
+            # The channel was requested explicitly, so the exclude list doesn't apply
+            preferences = self.preference_engine.get_preferences()
+            context = self._build_search_context(preferences, '')
+            context['exclude_channels'] = set()
+            
+            survivors = [video for video in videos if self._passes_filters(video, context)]
+            results = self._rank_videos(survivors, context, limit=max_results)
+            
+            self.preference_engine.record_search(
+                query=query,
+                results_count=len(results)
+            )
+            
+            return results
             
         except Exception as e:
             logger.error(f"Channel search failed: {e}")
             return []
     
+    def _resolve_channel_id(self, channel_name):
+        """Look up a channel ID by name, remembering successful lookups"""
+        channel_id = self._channel_id_cache.get(channel_name)
+        
+        if channel_id is None:
+            channel_id = self.youtube_client.get_channel_id(channel_name)
+            if channel_id:
+                self._channel_id_cache[channel_name] = channel_id
+        
+        return channel_id
+    
     def get_trending_personalized(self, max_results=25):
         """Get trending videos personalized to user preferences"""
         try:
@@ -265,23 +481,17 @@ class PersonalizedSearchEngine:
                 'latest trending'
             ]
             
-            all_results = []
+            unique_results = {}
+            results_per_query = max_results // len(trending_queries)
             
-            for query in trending_queries:
-                results = self.search(query, max_results // len(trending_queries))
-                all_results.extend(results)
+            with closing(self._fan_out_searches(trending_queries, results_per_query)) as searches:
+                for query, future in searches:
+                    # Remove duplicates by video_id as results arrive
+                    self._merge_unique(unique_results, future.result(), max_results)
+                    if len(unique_results) >= max_results:
+                        break
             
-            # Remove duplicates by video_id
-            seen_ids = set()
-            unique_results = []
-            
-            for video in all_results:
-                video_id = video.get('video_id', '')
-                if video_id not in seen_ids:
-                    seen_ids.add(video_id)
-                    unique_results.append(video)
-            
-            return unique_results[:max_results]
+            return list(unique_results.values())
             
         except Exception as e:
             logger.error(f"Trending search failed: {e}")
@@ -305,33 +515,77 @@ class PersonalizedSearchEngine:
             for channel in preferred_channels:
                 queries.append(f"channel:{channel}")
             
+            # Results are already filtered by every preference (exclusions,
+            # disliked keywords, views, duration, age), so all of them key the cache
+            cache_key = (self._preferences_fingerprint(preferences), max_results)
+            if self.enable_caching:
+                with self._cache_lock:
+                    cached = self._recommendation_cache.get(cache_key)
+                if cached is not None:
+                    return copy.deepcopy(cached)
+            
             # If no preferences, use generic recommendations
             if not queries:
                 queries = ['educational', 'entertainment', 'technology', 'music']
             
-            all_results = []
+            unique_results = {}
             results_per_query = max(1, max_results // len(queries))
-            
-            for query in queries:
-                try:
-                    results = self.search(query, results_per_query)
-                    all_results.extend(results)
-                except Exception as e:
-                    logger.warning(f"Failed to get recommendations for query '{query}': {e}")
-                    continue
-            
-            # Remove duplicates and limit results
-            seen_ids = set()
-            unique_results = []
-            
-            for video in all_results:
-                video_id = video.get('video_id', '')
-                if video_id not in seen_ids:
-                    seen_ids.add(video_id)
-                    unique_results.append(video)
-            
-            return unique_results[:max_results]
+            complete = True
+            
+            with closing(self._fan_out_searches(queries, results_per_query)) as searches:
+                for query, future in searches:
+                    try:
+                        # Remove duplicates and limit results as they arrive
+                        self._merge_unique(unique_results, future.result(), max_results)
+                    except Exception as e:
+                        logger.warning(f"Failed to get recommendations for query '{query}': {e}")
+                        complete = False
+                        continue
+                    
+                    if len(unique_results) >= max_results:
+                        break
+            
+            recommendations = list(unique_results.values())
+            
+            # Partial results are retried on the next call instead of cached
+            if self.enable_caching and complete:
+                with self._cache_lock:
+                    self._recommendation_cache[cache_key] = copy.deepcopy(recommendations)
+            
+            return recommendations
             
         except Exception as e:
             logger.error(f"Recommendations failed: {e}")
-            return []
\ No newline at end of file
+            return []
+    
+    def _preferences_fingerprint(self, preferences):
+        """Hashable snapshot of preference values (JSON-like types repr deterministically)"""
+        return tuple((key, repr(value)) for key, value in sorted(preferences.items()))
+    
+    def _fan_out_searches(self, queries, results_per_query):
+        """
+        Run searches concurrently, yielding (query, future) pairs in query order
+        
+        Closing the generator early cancels searches that have not started;
+        searches already in flight finish in the background and still warm
+        the cache.
+        """
+        # Searches are I/O bound, so run them concurrently
+        executor = ThreadPoolExecutor(max_workers=min(_MAX_SEARCH_WORKERS, len(queries)))
+        
+        try:
+            futures = [(query, executor.submit(self.search, query, results_per_query))
+                       for query in queries]
+            yield from futures
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _merge_unique(self, unique_results, videos, max_results):
+        """Add unseen videos to an insertion-ordered dict keyed by video_id"""
+        for video in videos:
+            if len(unique_results) >= max_results:
+                break
+            
+            video_id = video.get('video_id', '')
+            if video_id and video_id not in unique_results:
+                unique_results[video_id] = video
\ No newline at end of file
@@ -3,22 +3,167 @@ User Preference Engine
 Handles learning and storing user preferences for video recommendations
 """
 
-import json
+import atexit
+import copy
 import sqlite3
 import logging
-from datetime import datetime
+import queue
+import re
+import threading
+import weakref
+from contextlib import contextmanager
 from collections import defaultdict
+from urllib.parse import quote
 import os
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Applied to every connection: in-memory temp tables, a ~20 MB page cache,
+# lock waits instead of immediate errors and memory-mapped reads
+_CONNECTION_PRAGMAS = '''
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-20000;
+    PRAGMA busy_timeout=5000;
+    PRAGMA mmap_size=268435456;
+'''
+
+# Applied to the writer only: WAL lets readers proceed during writes, and
+# NORMAL sync skips the per-commit fsync that WAL makes unnecessary
+_WRITER_PRAGMAS = '''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+'''
+
+# Connection statement cache size; every hot statement below stays prepared
+_CACHED_STATEMENTS = 256
+
+# Hot-path statements. The insert constants are prefixes ending in VALUES;
+# _insert_rows appends one placeholder group per row, so each distinct chunk
+# length is its own statement. Full-size chunks always reuse one prepared
+# statement; only a batch's final, shorter chunk prepares a statement for
+# its length (kept afterwards in the statement cache).
+_INSERT_INTERACTIONS_SQL = '''
+    INSERT INTO user_interactions 
+    (video_id, action, query, channel, category, duration, view_count)
+    VALUES '''
+
+_INSERT_SEARCHES_SQL = '''
+    INSERT INTO search_history 
+    (query, results_count, clicked_video_id)
+    VALUES '''
+
+# Buffered rows are inserted with multi-row VALUES statements of at most this
+# many rows, kept under SQLite's historical 999 bound-parameter limit
+_MAX_INSERT_ROWS = 300
+_MAX_INSERT_PARAMS = 999
+
+_UPSERT_PREFERENCES_SQL = '''
+    INSERT INTO prefs_blob (id, blob) VALUES (1, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        blob = excluded.blob,
+        updated_at = CURRENT_TIMESTAMP
+'''
+
+_SELECT_PREFERENCES_SQL = 'SELECT blob FROM prefs_blob WHERE id = 1'
+
+# Stored in PRAGMA user_version; one-time data migrations below it run on open
+_SCHEMA_VERSION = 1
+
+_SEARCH_HISTORY_SQL = '''
+    SELECT query, results_count, clicked_video_id, created_at
+    FROM search_history
+    ORDER BY created_at DESC, id DESC
+    LIMIT ?
+'''
+
+# ISO 8601 video durations as returned by the YouTube API, e.g. PT1H5M30S
+_DURATION_RE = re.compile(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?')
+
+# Candidate title keywords: a letter followed by at least three more word
+# characters or apostrophes
+_TOKEN_RE = re.compile(r"[^\W\d_][\w']{3,}")
+
+# Frequent words never learned as keywords
+_COMMON_WORDS = frozenset({
+    'this', 'that', 'with', 'have', 'will', 'from', 'they', 'know',
+    'want', 'been', 'good', 'much', 'some', 'time', 'very', 'when',
+    'come', 'here', 'just', 'like', 'long', 'make', 'many', 'over',
+    'such', 'take', 'than', 'them', 'well', 'were'
+})
+
+# Buffered interaction and search writes are flushed once this many are
+# pending, or after the flush interval (seconds)
+_WRITE_BATCH_SIZE = 64
+_WRITE_FLUSH_INTERVAL = 1.0
+
+# List preferences held in the cache as insertion-ordered sets (dict keys)
+# for O(1) membership checks; they are returned and stored as lists
+_SET_PREFERENCES = frozenset({
+    'preferred_channels', 'preferred_categories', 'preferred_keywords',
+    'exclude_channels', 'disliked_keywords'
+})
+
+# Engines with possibly unflushed writes. Held weakly so an engine dropped
+# without close() can still be collected (its __del__ flushes and closes).
+_open_engines = weakref.WeakSet()
+
+@atexit.register
+def _flush_open_engines():
+    """Flush buffered writes of every engine still open at interpreter exit"""
+    for engine in list(_open_engines):
+        engine.flush()
+
 class UserPreferenceEngine:
     """Engine for learning and applying user preferences"""
     
+    # Database files whose schema this process has already created or migrated
+    _initialized = set()
+    
     def __init__(self, db_path='user_preferences.db'):
         """Initialize preference engine with database"""
         self.db_path = db_path
-        self._init_database()
+        in_memory = db_path in (':memory:', '')
+        db_key = None if in_memory else os.path.abspath(db_path)
+        db_existed = not in_memory and os.path.exists(db_path)
+        
+        # A single writer connection, serialized by a lock since SQLite allows
+        # one writer at a time
+        self._write_lock = threading.Lock()
+        self._write_conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None,
+                                           cached_statements=_CACHED_STATEMENTS)
+        self._write_conn.executescript(_WRITER_PRAGMAS + _CONNECTION_PRAGMAS)
+        
+        # One cursor reused by every write transaction (always under the write lock)
+        self._write_cursor = self._write_conn.cursor()
+        
+        # Every in-memory database starts empty; a file needs its schema only
+        # once per process, unless it was removed in the meantime
+        if in_memory or not db_existed or db_key not in UserPreferenceEngine._initialized:
+            self._init_database()
+            if not in_memory:
+                UserPreferenceEngine._initialized.add(db_key)
+        
+        # Read-only connections so reads run in parallel under WAL. In-memory
+        # databases are private to one connection, so they read via the writer.
+        self._read_pool = None
+        if not in_memory:
+            self._read_pool = queue.Queue()
+            for _ in range(os.cpu_count() or 1):
+                self._read_pool.put(self._open_read_connection())
+        
+        # Interactions and searches are buffered and written in batches
+        self._pending_lock = threading.Lock()
+        self._pending_interactions = []
+        self._pending_searches = []
+        self._preferences_dirty = False
+        self._flush_timer = None
+        _open_engines.add(self)
+        
+        # Preferences are loaded once and kept in memory; learned changes mark
+        # them dirty and the next flush writes the whole set as one row
+        self._pref_lock = threading.RLock()
+        self._pref_cache = None
         
         # Default preferences
         self.default_preferences = {
@@ -34,98 +179,335 @@ class UserPreferenceEngine:
             'disliked_keywords': []
         }
     
+    def _open_read_connection(self):
+        """Open a read-only connection to the database file"""
+        uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None,
+                               cached_statements=_CACHED_STATEMENTS)
+        conn.executescript(_CONNECTION_PRAGMAS)
+        return conn
+    
+    @contextmanager
+    def _read_conn(self):
+        """Borrow a read-only connection from the pool"""
+        if self._read_pool is None:
+            with self._write_lock:
+                yield self._write_conn
+            return
+        
+        conn = self._read_pool.get()
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
+    
+    @contextmanager
+    def _transaction(self):
+        """Run statements in a single write transaction on the writer connection"""
+        with self._write_lock:
+            cursor = self._write_cursor
+            # Take the write lock up front so the transaction never has to
+            # upgrade from a read lock, which can deadlock under WAL
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                yield cursor
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+            else:
+                cursor.execute('COMMIT')
+    
+    def _query(self, sql, params=()):
+        """Run a read query on a pooled connection and fetch all rows"""
+        with self._read_conn() as conn:
+            return conn.execute(sql, params).fetchall()
+    
+    def _buffer_write(self, kind, *rows):
+        """Queue 'interactions' or 'searches' rows for the next batched flush"""
+        with self._pending_lock:
+            # Look the list up under the lock; flush swaps in fresh lists
+            pending = self._pending_interactions if kind == 'interactions' else self._pending_searches
+            pending.extend(rows)
+            pending_count = len(self._pending_interactions) + len(self._pending_searches)
+            
+            if pending_count < _WRITE_BATCH_SIZE and self._flush_timer is None:
+                self._flush_timer = threading.Timer(_WRITE_FLUSH_INTERVAL, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        
+        if pending_count >= _WRITE_BATCH_SIZE:
+            self.flush()
+    
+    def _mark_preferences_dirty(self):
+        """Schedule the cached preferences to be written with the next flush"""
+        with self._pending_lock:
+            self._preferences_dirty = True
+            
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(_WRITE_FLUSH_INTERVAL, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def flush(self):
+        """Write all buffered interactions, searches and preference changes in one transaction"""
+        # The preference lock is held through the write (always taken before
+        # the write and pending locks, as in update_preferences) so the blob is
+        # serialized inside the transaction and an older snapshot can never
+        # land on top of a newer one
+        with self._pref_lock:
+            with self._pending_lock:
+                interactions, self._pending_interactions = self._pending_interactions, []
+                searches, self._pending_searches = self._pending_searches, []
+                preferences_dirty, self._preferences_dirty = self._preferences_dirty, False
+                
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+            
+            if not interactions and not searches and not preferences_dirty:
+                return
+            
+            try:
+                with self._transaction() as cursor:
+                    if interactions:
+                        self._insert_rows(cursor, _INSERT_INTERACTIONS_SQL, interactions)
+                    
+                    if searches:
+                        self._insert_rows(cursor, _INSERT_SEARCHES_SQL, searches)
+                    
+                    if preferences_dirty:
+                        cursor.execute(_UPSERT_PREFERENCES_SQL, (self._serialize_preferences(),))
+                
+            except Exception as e:
+                logger.error(f"Failed to write {len(interactions)} interactions, "
+                             f"{len(searches)} searches and preferences: {e}")
+                
+                # Requeue the batch ahead of rows buffered since, for the next flush;
+                # cached preferences are still ahead of the database
+                with self._pending_lock:
+                    self._pending_interactions[:0] = interactions
+                    self._pending_searches[:0] = searches
+                    if preferences_dirty:
+                        self._preferences_dirty = True
+    
+    def _insert_rows(self, cursor, insert_sql, rows):
+        """Insert rows with as few multi-row VALUES statements as the parameter limit allows"""
+        width = len(rows[0])
+        chunk_size = min(_MAX_INSERT_ROWS, _MAX_INSERT_PARAMS // width)
+        placeholder = '(' + ', '.join('?' * width) + ')'
+        
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            cursor.execute(insert_sql + ', '.join([placeholder] * len(chunk)),
+                           [value for row in chunk for value in row])
+    
+    def close(self):
+        """Flush buffered writes and close all database connections"""
+        if getattr(self, '_write_conn', None) is not None:
+            self.flush()
+            _open_engines.discard(self)
+        
+        read_pool, self._read_pool = getattr(self, '_read_pool', None), None
+        if read_pool is not None:
+            while not read_pool.empty():
+                read_pool.get_nowait().close()
+        
+        write_conn, self._write_conn = getattr(self, '_write_conn', None), None
+        if write_conn is not None:
+            # Refresh planner statistics if the tables have grown
+            write_conn.execute('PRAGMA optimize')
+            write_conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+    
     def _init_database(self):
         """Initialize SQLite database for storing preferences and interactions"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Create preferences table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS user_preferences (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    preference_key TEXT UNIQUE NOT NULL,
-                    preference_value TEXT NOT NULL,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Create user interactions table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS user_interactions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    video_id TEXT NOT NULL,
-                    action TEXT NOT NULL,
-                    query TEXT,
-                    channel TEXT,
-                    category TEXT,
-                    duration INTEGER,
-                    view_count INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Create search history table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS search_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    query TEXT NOT NULL,
-                    results_count INTEGER,
-                    clicked_video_id TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
+            with self._transaction() as cursor:
+                # Create preferences table, holding all preferences as one JSON row
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS prefs_blob (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        blob BLOB NOT NULL,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # Migrate preferences from the old one-row-per-key table, which
+                # is left in place
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_preferences'")
+                if cursor.fetchone() is not None:
+                    cursor.execute('SELECT 1 FROM prefs_blob WHERE id = 1')
+                    if cursor.fetchone() is None:
+                        cursor.execute('SELECT preference_key, preference_value FROM user_preferences')
+                        rows = cursor.fetchall()
+                        if rows:
+                            cursor.execute(_UPSERT_PREFERENCES_SQL, (orjson.dumps(self._decode_rows(rows)),))
+                
+                # Create user interactions table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS user_interactions (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        video_id TEXT NOT NULL,
+                        action TEXT NOT NULL,
+                        query TEXT,
+                        channel TEXT,
+                        category TEXT,
+                        duration INTEGER,
+                        view_count INTEGER,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # Create search history table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS search_history (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        query TEXT NOT NULL,
+                        results_count INTEGER,
+                        clicked_video_id TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # Indexes for the stats and history queries
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_interactions_action_channel
+                    ON user_interactions(action, channel)
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_interactions_created
+                    ON user_interactions(created_at DESC)
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_search_created_id
+                    ON search_history(created_at DESC, id DESC)
+                ''')
+                
+                cursor.execute('PRAGMA user_version')
+                migrate = cursor.fetchone()[0] < _SCHEMA_VERSION
+                if migrate:
+                    # Rows written before timestamps came from the column defaults hold
+                    # local-time ISO strings ('T' separator, microseconds); convert them
+                    # to the defaults' UTC 'YYYY-MM-DD HH:MM:SS' so history sorts correctly
+                    for table in ('user_interactions', 'search_history'):
+                        cursor.execute(f"""
+                            UPDATE {table} SET created_at = datetime(created_at, 'utc')
+                            WHERE created_at LIKE '____-__-__T%'
+                        """)
+                    
+                    # Superseded by idx_search_created_id, which also covers the id tiebreak
+                    cursor.execute('DROP INDEX IF EXISTS idx_search_created')
+                    cursor.execute(f'PRAGMA user_version = {_SCHEMA_VERSION}')
+                
+                # Gather planner statistics the first time the schema is created
+                # or migrated
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+                if migrate or cursor.fetchone() is None:
+                    cursor.execute('ANALYZE')
             
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}")
             raise
     
-    def get_preferences(self):
-        """Get current user preferences"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT preference_key, preference_value FROM user_preferences')
-            rows = cursor.fetchall()
+    def _load_preferences(self):
+        """Return the cached preferences, loading them from the database on first use"""
+        if self._pref_cache is None:
+            rows = self._query(_SELECT_PREFERENCES_SQL)
             
-            preferences = self.default_preferences.copy()
+            preferences = dict(self.default_preferences)
+            if rows:
+                preferences.update(orjson.loads(rows[0][0]))
             
-            for key, value in rows:
-                try:
-                    preferences[key] = json.loads(value)
-                except json.JSONDecodeError:
-                    preferences[key] = value
+            self._pref_cache = {key: self._to_cached(key, value) for key, value in preferences.items()}
+        
+        return self._pref_cache
+    
+    def _decode_rows(self, rows):
+        """Decode (key, value) rows from the old preferences table, keeping non-JSON values as strings"""
+        preferences = {}
+        for key, value in rows:
+            try:
+                preferences[key] = orjson.loads(value)
+            except orjson.JSONDecodeError:
+                preferences[key] = value
+        return preferences
+    
+    def _to_cached(self, key, value):
+        """Convert a preference value to its in-memory form"""
+        if key in _SET_PREFERENCES and isinstance(value, list):
+            return dict.fromkeys(value)
+        return copy.deepcopy(value)
+    
+    def _from_cached(self, key, value):
+        """Convert an in-memory preference value back to its stored form"""
+        if key in _SET_PREFERENCES and isinstance(value, dict):
+            return list(value)
+        return copy.deepcopy(value)
+    
+    def get_preferences(self, keys=None):
+        """
+        Get current user preferences
+        
+        Args:
+            keys (iterable): Only return these preference keys (all when None)
             
-            conn.close()
-            return preferences
+        Returns:
+            dict: Preference values, with defaults for keys never stored
+        """
+        try:
+            with self._pref_lock:
+                if keys is None:
+                    return {key: self._from_cached(key, value)
+                            for key, value in self._load_preferences().items()}
+                
+                cached = self._load_preferences()
+                return {key: self._from_cached(key, cached[key]) for key in keys if key in cached}
             
         except Exception as e:
             logger.error(f"Failed to get preferences: {e}")
-            return self.default_preferences.copy()
+            defaults = copy.deepcopy(self.default_preferences)
+            return defaults if keys is None else {key: defaults[key] for key in keys if key in defaults}
+    
+    def _serialize_preferences(self):
+        """Serialize the cached preferences to the stored JSON blob"""
+        return orjson.dumps({key: self._from_cached(key, value)
+                             for key, value in self._load_preferences().items()})
     
     def update_preferences(self, preferences):
-        """Update user preferences"""
+        """Update user preferences, skipping the write when nothing changed"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            for key, value in preferences.items():
-                value_json = json.dumps(value) if isinstance(value, (list, dict)) else str(value)
+            with self._pref_lock:
+                cached = self._load_preferences()
+                changed = {key: value for key, value in preferences.items()
+                           if key not in cached or self._from_cached(key, cached[key]) != value}
                 
-                cursor.execute('''
-                    INSERT OR REPLACE INTO user_preferences 
-                    (preference_key, preference_value, updated_at)
-                    VALUES (?, ?, ?)
-                ''', (key, value_json, datetime.now().isoformat()))
-            
-            conn.commit()
-            conn.close()
+                if not changed:
+                    return
+                
+                merged = {key: self._from_cached(key, value) for key, value in cached.items()}
+                merged.update(changed)
+                
+                with self._transaction() as cursor:
+                    cursor.execute(_UPSERT_PREFERENCES_SQL, (orjson.dumps(merged),))
+                
+                # The written row includes any learned changes still waiting to flush
+                with self._pending_lock:
+                    self._preferences_dirty = False
+                
+                cached.update((key, self._to_cached(key, value)) for key, value in changed.items())
             
-            logger.info(f"Updated preferences: {list(preferences.keys())}")
+            logger.info(f"Updated preferences: {list(changed.keys())}")
             
         except Exception as e:
             logger.error(f"Failed to update preferences: {e}")
@@ -134,27 +516,16 @@ class UserPreferenceEngine:
     def record_interaction(self, video_data, action, query=None):
         """Record user interaction with a video"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO user_interactions 
-                (video_id, action, query, channel, category, duration, view_count, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            self._buffer_write('interactions', (
                 video_data.get('video_id', ''),
                 action,
                 query,
                 video_data.get('channel', ''),
                 video_data.get('category_id', ''),
                 self._parse_duration(video_data.get('duration', 'PT0M0S')),
-                video_data.get('view_count', 0),
-                datetime.now().isoformat()
+                video_data.get('view_count', 0)
             ))
             
-            conn.commit()
-            conn.close()
-            
             # Update preferences based on interaction
             if action in ['clicked', 'liked', 'watched']:
                 self._learn_from_interaction(video_data, action)
@@ -165,101 +536,83 @@ class UserPreferenceEngine:
     def _learn_from_interaction(self, video_data, action):
         """Learn user preferences from positive interactions"""
         try:
-            preferences = self.get_preferences()
-            
-            # Learn from channel preferences
-            channel = video_data.get('channel', '')
-            if channel and action in ['clicked', 'liked', 'watched']:
-                if channel not in preferences['preferred_channels']:
-                    preferences['preferred_channels'].append(channel)
-                    # Limit to top 50 preferred channels
-                    if len(preferences['preferred_channels']) > 50:
-                        preferences['preferred_channels'] = preferences['preferred_channels'][-50:]
-            
-            # Learn from category preferences
-            category = video_data.get('category_id', '')
-            if category and action in ['clicked', 'liked']:
-                if category not in preferences['preferred_categories']:
-                    preferences['preferred_categories'].append(category)
-            
-            # Learn from video duration preferences
-            duration = self._parse_duration(video_data.get('duration', 'PT0M0S'))
-            if duration > 0 and action in ['watched', 'liked']:
-                # Adjust duration preferences based on watched videos
-                current_min = preferences.get('min_duration', 0)
-                current_max = preferences.get('max_duration', 7200)
+            with self._pref_lock:
+                preferences = self._load_preferences()
+                changed = set()
                 
-                # Gradually adjust preferences towards watched content
-                if duration < current_min:
-                    preferences['min_duration'] = max(0, current_min - 60)
-                if duration > current_max:
-                    preferences['max_duration'] = min(14400, current_max + 300)  # Max 4 hours
-            
-            # Learn from title keywords
-            title = video_data.get('title', '').lower()
-            if title and action in ['clicked', 'liked']:
-                # Extract potential keywords (simple approach)
-                words = [word.strip('.,!?()[]') for word in title.split() if len(word) > 3]
-                common_words = {'this', 'that', 'with', 'have', 'will', 'from', 'they', 'know', 
-                               'want', 'been', 'good', 'much', 'some', 'time', 'very', 'when', 
-                               'come', 'here', 'just', 'like', 'long', 'make', 'many', 'over', 
-                               'such', 'take', 'than', 'them', 'well', 'were'}
+                # Learn from channel preferences
+                channel = video_data.get('channel', '')
+                if channel and action in ['clicked', 'liked', 'watched']:
+                    channels = preferences['preferred_channels']
+                    if channel not in channels:
+                        channels[channel] = None
+                        # Limit to the 50 most recently preferred channels
+                        if len(channels) > 50:
+                            del channels[next(iter(channels))]
+                        changed.add('preferred_channels')
                 
-                for word in words:
-                    if (word not in common_words and 
-                        word not in preferences['preferred_keywords'] and 
-                        len(preferences['preferred_keywords']) < 100):
-                        preferences['preferred_keywords'].append(word)
-            
-            self.update_preferences(preferences)
+                # Learn from category preferences
+                category = video_data.get('category_id', '')
+                if category and action in ['clicked', 'liked']:
+                    categories = preferences['preferred_categories']
+                    if category not in categories:
+                        categories[category] = None
+                        changed.add('preferred_categories')
+                
+                # Learn from video duration preferences
+                duration = self._parse_duration(video_data.get('duration', 'PT0M0S'))
+                if duration > 0 and action in ['watched', 'liked']:
+                    # Adjust duration preferences based on watched videos
+                    current_min = preferences.get('min_duration', 0)
+                    current_max = preferences.get('max_duration', 7200)
+                    
+                    # Gradually adjust preferences towards watched content
+                    if duration < current_min:
+                        preferences['min_duration'] = max(0, current_min - 60)
+                        changed.add('min_duration')
+                    if duration > current_max:
+                        preferences['max_duration'] = min(14400, current_max + 300)  # Max 4 hours
+                        changed.add('max_duration')
+                
+                # Learn from title keywords
+                title = video_data.get('title', '').lower()
+                if title and action in ['clicked', 'liked']:
+                    # Extract potential keywords (simple approach)
+                    words = _TOKEN_RE.findall(title)
+                    
+                    keywords = preferences['preferred_keywords']
+                    keyword_count = len(keywords)
+                    for word in words:
+                        if (word not in _COMMON_WORDS and 
+                            word not in keywords and 
+                            len(keywords) < 100):
+                            keywords[word] = None
+                    
+                    if len(keywords) != keyword_count:
+                        changed.add('preferred_keywords')
+                
+                # Persist with the next batched flush, alongside the interaction
+                if changed:
+                    self._mark_preferences_dirty()
             
         except Exception as e:
             logger.error(f"Failed to learn from interaction: {e}")
     
     def _parse_duration(self, duration_str):
         """Parse ISO 8601 duration string to seconds"""
-        try:
-            # Simple parser for PT#M#S format
-            if not duration_str.startswith('PT'):
-                return 0
-            
-            duration_str = duration_str[2:]  # Remove 'PT'
-            total_seconds = 0
-            
-            # Parse hours
-            if 'H' in duration_str:
-                hours, duration_str = duration_str.split('H', 1)
-                total_seconds += int(hours) * 3600
-            
-            # Parse minutes
-            if 'M' in duration_str:
-                minutes, duration_str = duration_str.split('M', 1)
-                total_seconds += int(minutes) * 60
-            
-            # Parse seconds
-            if 'S' in duration_str:
-                seconds = duration_str.split('S')[0]
-                total_seconds += int(seconds)
-            
-            return total_seconds
-            
-        except Exception:
+        match = _DURATION_RE.fullmatch(duration_str) if isinstance(duration_str, str) else None
+        if not match:
             return 0
+        
+        hours, minutes, seconds = match.groups()
+        return ((int(hours) if hours else 0) * 3600 +
+                (int(minutes) if minutes else 0) * 60 +
+                (int(seconds) if seconds else 0))
     
     def record_search(self, query, results_count, clicked_video_id=None):
         """Record search query and results"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO search_history 
-                (query, results_count, clicked_video_id, created_at)
-                VALUES (?, ?, ?, ?)
-            ''', (query, results_count, clicked_video_id, datetime.now().isoformat()))
-            
-            conn.commit()
-            conn.close()
+            self._buffer_write('searches', (query, results_count, clicked_video_id))
             
         except Exception as e:
             logger.error(f"Failed to record search: {e}")
@@ -267,18 +620,9 @@ class UserPreferenceEngine:
     def get_search_history(self, limit=50):
         """Get recent search history"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            self.flush()
             
-            cursor.execute('''
-                SELECT query, results_count, clicked_video_id, created_at
-                FROM search_history
-                ORDER BY created_at DESC
-                LIMIT ?
-            ''', (limit,))
-            
-            rows = cursor.fetchall()
-            conn.close()
+            rows = self._query(_SEARCH_HISTORY_SQL, (limit,))
             
             return [{'query': row[0], 'results_count': row[1], 
                     'clicked_video_id': row[2], 'created_at': row[3]} 
@@ -291,19 +635,17 @@ class UserPreferenceEngine:
     def get_interaction_stats(self):
         """Get statistics about user interactions"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            self.flush()
             
             # Get action counts
-            cursor.execute('''
+            action_counts = dict(self._query('''
                 SELECT action, COUNT(*) 
                 FROM user_interactions 
                 GROUP BY action
-            ''')
-            action_counts = dict(cursor.fetchall())
+            '''))
             
             # Get top channels
-            cursor.execute('''
+            top_channels = self._query('''
                 SELECT channel, COUNT(*) 
                 FROM user_interactions 
                 WHERE action IN ('clicked', 'liked', 'watched')
@@ -311,9 +653,6 @@ class UserPreferenceEngine:
                 ORDER BY COUNT(*) DESC
                 LIMIT 10
             ''')
-            top_channels = cursor.fetchall()
-            
-            conn.close()
             
             return {
                 'action_counts': action_counts,
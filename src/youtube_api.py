@@ -3,67 +3,202 @@ YouTube API Client
 Handles communication with YouTube Data API v3
 """
 
+import hashlib
+import inspect
 import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
 
 logger = logging.getLogger(__name__)
 
+# Partial-response mask for search().list. Keep in sync with the snippet keys
+# read in search_videos; statistics and duration come from _add_video_statistics.
+SEARCH_FIELDS = 'items(id/videoId,snippet(title,description,channelTitle,publishedAt,thumbnails/medium/url))'
+
+# Partial-response masks for the other endpoints, matching the keys each method reads
+_STATISTICS_FIELDS = 'items(id,statistics(viewCount,likeCount,commentCount),contentDetails/duration)'
+_VIDEO_DETAILS_FIELDS = ('items(snippet(title,channelTitle,description,publishedAt,thumbnails/maxres/url,'
+                         'tags,categoryId),statistics(viewCount,likeCount,commentCount),contentDetails/duration)')
+_CHANNEL_INFO_FIELDS = ('items(snippet(title,description,thumbnails/medium/url),'
+                        'statistics(subscriberCount,videoCount,viewCount))')
+
+# search().list returns at most this many results per page
+_MAX_PAGE_SIZE = 50
+
+# Response cache lifetimes (seconds) per endpoint
+_SEARCH_CACHE_TTL = 600
+_VIDEO_CACHE_TTL = 3600
+_CHANNEL_CACHE_TTL = 86400
+
+class SearchResults(list):
+    """
+    Search results, flagged with whether every statistics lookup succeeded
+    
+    Results are missing statistics when a lookup failed (e.g. quota or
+    server errors), so such responses should not be cached. Videos the
+    lookup simply did not return (e.g. deleted meanwhile) do not count.
+    """
+    
+    def __init__(self, videos=(), statistics_complete=True):
+        super().__init__(videos)
+        self.statistics_complete = statistics_complete
+
+def _cached(endpoint, ttl, cache_if=None):
+    """
+    Cache a client method's result in the client's response cache
+    
+    Entries are keyed on the endpoint and the bound call arguments, so
+    positional and keyword calls share entries. None results (not found or
+    failed lookups), and results rejected by cache_if, are never cached.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if self.cache is None:
+                return func(self, *args, **kwargs)
+            
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = list(bound.arguments.items())[1:]
+            key = 'yt:' + hashlib.blake2b(f"{endpoint}:{params}".encode(), digest_size=16).hexdigest()
+            
+            result = self._cache_get(key)
+            if result is None:
+                result = func(self, *args, **kwargs)
+                if result is not None and (cache_if is None or cache_if(result)):
+                    self._cache_set(key, result, ttl)
+            
+            return result
+        
+        return wrapper
+    
+    return decorator
+
 class YouTubeSearchClient:
     """Client for YouTube Data API v3"""
     
-    def __init__(self, api_key):
-        """Initialize YouTube API client"""
+    def __init__(self, api_key, cache=None):
+        """
+        Initialize YouTube API client
+        
+        Args:
+            api_key (str): YouTube Data API key
+            cache: Optional response cache (e.g. diskcache.Cache) shared across
+                workers and restarts
+        """
         self.api_key = api_key
+        self.cache = cache
         self.youtube = build('youtube', 'v3', developerKey=api_key)
+        
+        # httplib2 connections are not thread-safe, so each request checks one
+        # out of a pool. Pooled connections keep their TLS sessions alive across
+        # requests and outlive the short-lived worker threads that use them.
+        self._http_pool = queue.LifoQueue()
+        
+        # Fetches statistics for one result page while the next page is requested
+        self._stats_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='youtube-stats')
+    
+    def _execute(self, request):
+        """Execute an API request on a pooled keep-alive HTTP connection"""
+        try:
+            http = self._http_pool.get_nowait()
+        except queue.Empty:
+            http = build_http()
+        
+        try:
+            return request.execute(http=http)
+        finally:
+            self._http_pool.put(http)
+    
+    def _cache_get(self, key):
+        """Read from the response cache, treating cache errors as misses"""
+        try:
+            return self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+    
+    def _cache_set(self, key, value, ttl):
+        """Write to the response cache; failures only cost a future miss"""
+        try:
+            self.cache.set(key, value, expire=ttl)
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
     
-    def search_videos(self, query, max_results=25, order='relevance'):
+    @_cached('search', _SEARCH_CACHE_TTL, cache_if=lambda videos: videos.statistics_complete)
+    def search_videos(self, query, max_results=25, order='relevance', fields=SEARCH_FIELDS,
+                      channel_id=None):
         """
         Search for videos using YouTube API
         
+        Results beyond one page (50) are fetched page by page; each page's
+        statistics are requested while the next page is being fetched.
+        
         Args:
-            query (str): Search query
+            query (str): Search query (may be empty when channel_id is given)
             max_results (int): Maximum number of results to return
             order (str): Sort order ('relevance', 'date', 'viewCount', 'rating')
+            fields (str): Partial-response mask, or None for the full response
+            channel_id (str): Restrict results to this channel
             
         Returns:
-            list: List of video data dictionaries
+            SearchResults: List of video data dictionaries
         """
         try:
-            # Perform search request
-            search_response = self.youtube.search().list(
-                q=query,
-                part='id,snippet',
-                type='video',
-                maxResults=max_results,
-                order=order
-            ).execute()
+            search_params = {
+                'part': 'id,snippet',
+                'type': 'video',
+                'maxResults': min(max_results, _MAX_PAGE_SIZE),
+                'order': order,
+                'fields': fields
+            }
+            if fields and max_results > _MAX_PAGE_SIZE:
+                search_params['fields'] = f"{fields},nextPageToken"
+            if query:
+                search_params['q'] = query
+            if channel_id:
+                search_params['channelId'] = channel_id
             
             videos = []
-            video_ids = []
+            pending_stats = []
+            statistics_complete = True
             
-            # Extract video IDs and basic info
-            for search_result in search_response.get('items', []):
-                video_id = search_result['id']['videoId']
-                video_ids.append(video_id)
+            while True:
+                # Perform search request
+                search_response = self._execute(self.youtube.search().list(**search_params))
                 
-                video_data = {
-                    'video_id': video_id,
-                    'title': search_result['snippet']['title'],
-                    'channel': search_result['snippet']['channelTitle'],
-                    'description': search_result['snippet']['description'][:200] + '...' if len(search_result['snippet']['description']) > 200 else search_result['snippet']['description'],
-                    'published_at': search_result['snippet']['publishedAt'],
-                    'thumbnail': search_result['snippet']['thumbnails'].get('medium', {}).get('url', ''),
-                    'url': f"https://www.youtube.com/watch?v={video_id}"
-                }
-                videos.append(video_data)
-            
-            # Get additional video statistics
-            if video_ids:
-                self._add_video_statistics(videos, video_ids)
+                # Extract video IDs and basic info
+                page = [self._video_from_search_result(search_result)
+                        for search_result in search_response.get('items', [])]
+                video_ids = [video['video_id'] for video in page]
+                
+                videos.extend(page)
+                
+                page_token = search_response.get('nextPageToken')
+                remaining = max_results - len(videos)
+                if not page or not page_token or remaining <= 0:
+                    # Get additional video statistics for the last page
+                    if video_ids:
+                        statistics_complete = self._add_video_statistics(page, video_ids)
+                    break
+                
+                # Get this page's statistics while the next page is fetched
+                pending_stats.append(
+                    self._stats_executor.submit(self._add_video_statistics, page, video_ids))
+                search_params['pageToken'] = page_token
+                search_params['maxResults'] = min(remaining, _MAX_PAGE_SIZE)
+            
+            for future in pending_stats:
+                statistics_complete = future.result() and statistics_complete
             
             logger.info(f"Found {len(videos)} videos for query: {query}")
-            return videos
+            return SearchResults(videos, statistics_complete)
             
         except HttpError as e:
             logger.error(f"YouTube API error: {e}")
@@ -72,14 +207,36 @@ class YouTubeSearchClient:
             logger.error(f"Search error: {e}")
             raise Exception(f"Search error: {e}")
     
+    def _video_from_search_result(self, search_result):
+        """Build the basic video data dictionary for one search result"""
+        video_id = search_result['id']['videoId']
+        snippet = search_result['snippet']
+        description = snippet['description']
+        
+        return {
+            'video_id': video_id,
+            'title': snippet['title'],
+            'channel': snippet['channelTitle'],
+            'description': description[:200] + '...' if len(description) > 200 else description,
+            'published_at': snippet['publishedAt'],
+            'thumbnail': snippet['thumbnails'].get('medium', {}).get('url', ''),
+            'url': f"https://www.youtube.com/watch?v={video_id}"
+        }
+    
     def _add_video_statistics(self, videos, video_ids):
-        """Add view count and other statistics to video data"""
+        """
+        Add view count and other statistics to video data
+        
+        Returns:
+            bool: False if the statistics request failed
+        """
         try:
             # Get video statistics
-            stats_response = self.youtube.videos().list(
+            stats_response = self._execute(self.youtube.videos().list(
                 part='statistics,contentDetails',
-                id=','.join(video_ids)
-            ).execute()
+                id=','.join(video_ids),
+                fields=_STATISTICS_FIELDS
+            ))
             
             # Create mapping of video_id to statistics
             stats_map = {}
@@ -97,17 +254,59 @@ class YouTubeSearchClient:
                     video['like_count'] = int(stats.get('likeCount', 0))
                     video['comment_count'] = int(stats.get('commentCount', 0))
                     video['duration'] = content_details.get('duration', 'PT0M0S')
+            
+            return True
                     
         except Exception as e:
             logger.warning(f"Failed to add video statistics: {e}")
+            return False
+    
+    @_cached('channel_id', _CHANNEL_CACHE_TTL)
+    def get_channel_id(self, channel_name):
+        """
+        Resolve a channel name to its channel ID
+        
+        Tries the legacy username lookup first, then falls back to a channel search.
+        
+        Returns:
+            str: Channel ID, or None if no channel matches
+        """
+        try:
+            response = self._execute(self.youtube.channels().list(
+                part='id',
+                forUsername=channel_name,
+                fields='items/id'
+            ))
+            
+            if response.get('items'):
+                return response['items'][0]['id']
+            
+            response = self._execute(self.youtube.search().list(
+                q=channel_name,
+                part='id',
+                type='channel',
+                maxResults=1,
+                fields='items/id/channelId'
+            ))
+            
+            if response.get('items'):
+                return response['items'][0]['id']['channelId']
+            
+            return None
+            
+        except Exception as e:
+            logger.error(f"Failed to resolve channel ID for {channel_name}: {e}")
+            return None
     
+    @_cached('video_details', _VIDEO_CACHE_TTL)
     def get_video_details(self, video_id):
         """Get detailed information about a specific video"""
         try:
-            response = self.youtube.videos().list(
+            response = self._execute(self.youtube.videos().list(
                 part='snippet,statistics,contentDetails',
-                id=video_id
-            ).execute()
+                id=video_id,
+                fields=_VIDEO_DETAILS_FIELDS
+            ))
             
             if not response.get('items'):
                 return None
@@ -137,13 +336,15 @@ class YouTubeSearchClient:
             logger.error(f"Failed to get video details for {video_id}: {e}")
             return None
     
+    @_cached('channel_info', _CHANNEL_CACHE_TTL)
     def get_channel_info(self, channel_id):
         """Get information about a YouTube channel"""
         try:
-            response = self.youtube.channels().list(
+            response = self._execute(self.youtube.channels().list(
                 part='snippet,statistics',
-                id=channel_id
-            ).execute()
+                id=channel_id,
+                fields=_CHANNEL_INFO_FIELDS
+            ))
             
             if not response.get('items'):
                 return None
@@ -2,6 +2,7 @@
 Basic tests for the YouTube Search Engine
 """
 
+import orjson
 import pytest
 import sys
 import os
@@ -9,6 +10,14 @@ import os
 # Add src directory to Python path for testing
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+@pytest.fixture(scope='session')
+def preference_engine():
+    """In-memory preference engine shared by tests that only read from it"""
+    from user_preferences import UserPreferenceEngine
+    
+    with UserPreferenceEngine(':memory:') as engine:
+        yield engine
+
 class TestYouTubeSearchEngine:
     """Test cases for the main search engine functionality"""
     
@@ -30,15 +39,243 @@ class TestYouTubeSearchEngine:
         assert app is not None
         assert app.config['FLASK_DEBUG'] == True
     
-    def test_preference_engine_init(self):
+    def test_index_page_renders(self):
+        """Test that the search page is served from the template"""
+        from main import create_app
+        app = create_app('development')
+        response = app.test_client().get('/')
+        assert response.status_code == 200
+        assert b'YouTube Video Search Engine' in response.data
+    
+    def test_health_check_json(self):
+        """Test that JSON responses are encoded by the orjson provider"""
+        from main import create_app
+        app = create_app('development')
+        response = app.test_client().get('/health')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/json'
+        assert response.get_json()['status'] == 'healthy'
+    
+    def test_preference_engine_init(self, preference_engine):
         """Test that UserPreferenceEngine can be initialized"""
-        from user_preferences import UserPreferenceEngine
-        engine = UserPreferenceEngine(':memory:')  # Use in-memory database for testing
-        preferences = engine.get_preferences()
+        preferences = preference_engine.get_preferences()
         assert isinstance(preferences, dict)
         assert 'preferred_channels' in preferences
     
-    def test_duration_parsing(self):
+    def test_preference_engine_persists_with_memory_database(self):
+        """Test that writes are visible to later reads on the same in-memory database"""
+        from user_preferences import UserPreferenceEngine
+        
+        with UserPreferenceEngine(':memory:') as engine:
+            engine.update_preferences({'preferred_channels': ['Dev'], 'min_views': 100})
+            engine.record_search('python', results_count=3)
+            
+            preferences = engine.get_preferences()
+            assert preferences['preferred_channels'] == ['Dev']
+            assert preferences['min_views'] == 100
+            assert [entry['query'] for entry in engine.get_search_history()] == ['python']
+            
+            assert engine.get_preferences(keys=['min_views', 'max_age_days']) == {
+                'min_views': 100, 'max_age_days': 365}
+            
+            # All preferences are stored together in a single row
+            engine.update_preferences({'min_views': 500})
+            rows = engine._query('SELECT blob FROM prefs_blob')
+            assert len(rows) == 1
+            assert orjson.loads(rows[0][0])['min_views'] == 500
+    
+    def test_interactions_and_searches_written_in_batches(self):
+        """Test that buffered writes are committed together on flush"""
+        from user_preferences import UserPreferenceEngine
+        
+        with UserPreferenceEngine(':memory:') as engine:
+            engine.record_search('first', results_count=1)
+            engine.record_interaction({'video_id': 'abc', 'channel': 'Dev'}, 'skipped')
+            
+            count_rows = lambda table: engine._query(f'SELECT COUNT(*) FROM {table}')[0][0]
+            assert count_rows('search_history') == 0
+            
+            engine.flush()
+            assert count_rows('search_history') == 1
+            assert count_rows('user_interactions') == 1
+            
+            # Timestamps come from the column defaults; ties keep insertion order
+            engine.record_search('second', results_count=2)
+            history = engine.get_search_history()
+            assert [entry['query'] for entry in history] == ['second', 'first']
+            assert all(entry['created_at'] for entry in history)
+            
+            # Large batches are split into several multi-row inserts
+            from user_preferences import _INSERT_SEARCHES_SQL
+            with engine._transaction() as cursor:
+                engine._insert_rows(cursor, _INSERT_SEARCHES_SQL, [(str(i), i, None) for i in range(700)])
+            history = engine.get_search_history(limit=1000)
+            assert [entry['query'] for entry in history][:3] == ['699', '698', '697']
+            assert count_rows('search_history') == 702
+    
+    def test_learning_persists_preferences(self, tmp_path):
+        """Test that learned preferences are cached and written on flush"""
+        from user_preferences import UserPreferenceEngine
+        from unittest.mock import patch
+        
+        db_path = str(tmp_path / 'prefs.db')
+        with UserPreferenceEngine(db_path) as engine:
+            engine.record_interaction({'video_id': 'abc', 'channel': 'Dev'}, 'clicked')
+            assert engine.get_preferences()['preferred_channels'] == ['Dev']
+            
+            assert engine._query('SELECT blob FROM prefs_blob') == []
+            engine.flush()
+            stored = orjson.loads(engine._query('SELECT blob FROM prefs_blob')[0][0])
+            assert stored['preferred_channels'] == ['Dev']
+            
+            engine.record_interaction({'video_id': 'def', 'title': 'Learn (Python) with Rust-lang, 2024!'}, 'liked')
+            assert engine.get_preferences()['preferred_keywords'] == ['learn', 'python', 'rust', 'lang']
+            
+            # Returned preferences are copies, not the cache itself
+            engine.get_preferences()['preferred_channels'].append('Other')
+            assert engine.get_preferences()['preferred_channels'] == ['Dev']
+        
+        # Reopening the file in this process skips the schema setup
+        with patch.object(UserPreferenceEngine, '_init_database') as init_database:
+            UserPreferenceEngine(db_path).close()
+        init_database.assert_not_called()
+        
+        with UserPreferenceEngine(db_path) as engine:
+            assert engine.get_preferences(keys=['preferred_channels', 'min_views']) == {
+                'preferred_channels': ['Dev'], 'min_views': 0}
+            assert engine.get_preferences()['preferred_channels'] == ['Dev']
+            
+            # The channel list keeps only the 50 most recent, in order
+            for i in range(60):
+                engine.record_interaction({'video_id': str(i), 'channel': f'Channel {i}'}, 'watched')
+            channels = engine.get_preferences()['preferred_channels']
+            assert channels == [f'Channel {i}' for i in range(10, 60)]
+    
+    def test_failed_flush_requeues_rows(self):
+        """Test that a batch whose transaction fails is written by the next flush"""
+        from user_preferences import UserPreferenceEngine
+        from unittest.mock import patch
+        
+        with UserPreferenceEngine(':memory:') as engine:
+            engine.record_search('first', results_count=1)
+            with patch.object(engine, '_insert_rows', side_effect=Exception('disk I/O error')):
+                engine.flush()
+            
+            engine.record_search('second', results_count=1)
+            engine.flush()
+            assert [entry['query'] for entry in engine.get_search_history()] == ['second', 'first']
+    
+    def test_unclosed_engine_is_collected(self, tmp_path):
+        """Test that an engine dropped without close() is flushed and released"""
+        import gc
+        import weakref
+        from user_preferences import UserPreferenceEngine
+        
+        db_path = str(tmp_path / 'prefs.db')
+        engine = UserPreferenceEngine(db_path)
+        engine.record_search('python', results_count=1)
+        engine.flush()
+        engine.record_search('rust', results_count=1)
+        
+        # The timer thread holds engine.flush until it exits
+        timer, engine._flush_timer = engine._flush_timer, None
+        timer.cancel()
+        timer.join()
+        del timer
+        
+        engine_ref = weakref.ref(engine)
+        del engine
+        gc.collect()
+        assert engine_ref() is None
+        
+        with UserPreferenceEngine(db_path) as engine:
+            assert [entry['query'] for entry in engine.get_search_history()] == ['rust', 'python']
+    
+    def test_flush_never_overwrites_newer_preference_update(self):
+        """Test that an update committed while a flush is starting survives the flush"""
+        from user_preferences import UserPreferenceEngine
+        
+        with UserPreferenceEngine(':memory:') as engine:
+            engine.record_interaction({'video_id': 'abc', 'channel': 'Dev'}, 'clicked')
+            
+            # Commit an explicit update just before the flush's own transaction
+            transaction = engine._transaction
+            def update_then_transaction():
+                engine._transaction = transaction
+                engine.update_preferences({'exclude_channels': ['Spam']})
+                return transaction()
+            engine._transaction = update_then_transaction
+            
+            engine.flush()
+            
+            stored = orjson.loads(engine._query('SELECT blob FROM prefs_blob')[0][0])
+            assert stored['exclude_channels'] == ['Spam']
+            assert stored['preferred_channels'] == ['Dev']
+    
+    def test_legacy_database_migrated(self, tmp_path):
+        """Test that per-key preferences and local-time timestamps from older databases are migrated"""
+        import sqlite3
+        from user_preferences import UserPreferenceEngine
+        
+        db_path = str(tmp_path / 'prefs.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute('''
+            CREATE TABLE user_preferences (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                preference_key TEXT UNIQUE NOT NULL,
+                preference_value TEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.executemany('INSERT INTO user_preferences (preference_key, preference_value) VALUES (?, ?)',
+                         [('preferred_channels', '["Dev"]'), ('min_views', '100')])
+        conn.execute('''
+            CREATE TABLE search_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query TEXT NOT NULL,
+                results_count INTEGER,
+                clicked_video_id TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute("INSERT INTO search_history (query, results_count, created_at) "
+                     "VALUES ('old', 1, datetime('now', 'localtime', '-1 hour'))")
+        conn.execute("UPDATE search_history SET created_at = replace(created_at, ' ', 'T') || '.123456'")
+        conn.commit()
+        conn.close()
+        
+        with UserPreferenceEngine(db_path) as engine:
+            preferences = engine.get_preferences()
+            assert preferences['preferred_channels'] == ['Dev']
+            assert preferences['min_views'] == 100
+            assert preferences['max_age_days'] == 365
+            
+            engine.record_search('new', results_count=1)
+            history = engine.get_search_history()
+            assert [entry['query'] for entry in history] == ['new', 'old']
+            assert all('T' not in entry['created_at'] for entry in history)
+        
+        # The migration is recorded so it runs once, and history reads need no sort
+        from user_preferences import _SCHEMA_VERSION, _SEARCH_HISTORY_SQL
+        conn = sqlite3.connect(db_path)
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == _SCHEMA_VERSION
+        plan = conn.execute('EXPLAIN QUERY PLAN ' + _SEARCH_HISTORY_SQL, (10,)).fetchall()
+        assert not any('TEMP B-TREE' in row[-1] for row in plan)
+        conn.close()
+    
+    def test_preference_engine_reads_through_pool(self, tmp_path):
+        """Test that pooled read-only connections see committed writes"""
+        from user_preferences import UserPreferenceEngine
+        
+        with UserPreferenceEngine(str(tmp_path / 'prefs.db')) as engine:
+            engine.update_preferences({'preferred_keywords': ['python']})
+            assert engine.get_preferences()['preferred_keywords'] == ['python']
+            
+            with engine._read_conn() as conn:
+                with pytest.raises(Exception):
+                    conn.execute("DELETE FROM prefs_blob")
+    
+    def test_duration_parsing(self, preference_engine):
         """Test duration parsing functionality"""
         from search_engine import PersonalizedSearchEngine
         from unittest.mock import Mock
@@ -55,6 +292,288 @@ class TestYouTubeSearchEngine:
         assert engine._parse_duration('PT45S') == 45  # 45 seconds
         assert engine._parse_duration('PT2H') == 7200  # 2 hours
         assert engine._parse_duration('invalid') == 0  # Invalid format
+        
+        # The preference engine parses durations the same way
+        for duration in ('PT5M30S', 'PT1H30M', 'PT45S', 'PT2H', 'invalid', 'PT1M5S extra'):
+            assert preference_engine._parse_duration(duration) == engine._parse_duration(duration)
+    
+    def test_search_results_cached(self):
+        """Test that repeated searches are served from the TTL cache"""
+        from search_engine import PersonalizedSearchEngine
+        from unittest.mock import Mock
+        
+        mock_youtube = Mock()
+        mock_youtube.search_videos.return_value = [
+            {'video_id': 'abc', 'title': 'Python tutorial', 'channel': 'Dev',
+             'duration': 'PT10M', 'view_count': 1000}
+        ]
+        mock_prefs = Mock()
+        mock_prefs.get_preferences.return_value = {}
+        
+        engine = PersonalizedSearchEngine(mock_youtube, mock_prefs)
+        first = engine.search('python')
+        second = engine.search('python')
+        
+        assert first == second
+        assert mock_youtube.search_videos.call_count == 1
+    
+    def test_response_cache_serves_other_clients(self):
+        """Test that a shared response cache avoids API calls across client instances"""
+        from youtube_api import YouTubeSearchClient
+        from unittest.mock import Mock
+        
+        shared_cache = {}
+        response_cache = Mock()
+        response_cache.get.side_effect = shared_cache.get
+        response_cache.set.side_effect = lambda key, value, expire: shared_cache.__setitem__(key, value)
+        
+        clients = [YouTubeSearchClient('dummy', cache=response_cache) for _ in range(2)]
+        execute = Mock(return_value={'items': [{'id': 'UC123'}]})
+        for client in clients:
+            client.youtube = Mock()
+            client._execute = execute
+        
+        assert clients[0].get_channel_id('Dev') == clients[1].get_channel_id(channel_name='Dev') == 'UC123'
+        assert execute.call_count == 1
+        
+        # Failed lookups are not cached
+        execute.return_value = {'items': []}
+        clients[0].get_channel_id('Missing')
+        clients[1].get_channel_id('Missing')
+        assert execute.call_count == 5
+    
+    def test_results_without_statistics_not_cached(self):
+        """Test that searches whose statistics lookup failed are not cached"""
+        from youtube_api import YouTubeSearchClient
+        from search_engine import PersonalizedSearchEngine
+        from unittest.mock import Mock
+        
+        response_cache = Mock()
+        response_cache.get.return_value = None
+        
+        client = YouTubeSearchClient('dummy', cache=response_cache)
+        client.youtube = Mock()
+        client.youtube.search.return_value.list.return_value = 'search'
+        client.youtube.videos.return_value.list.return_value = 'videos'
+        
+        snippet = {'title': 't', 'channelTitle': 'c', 'description': 'd',
+                   'publishedAt': '2024-01-01T00:00:00Z', 'thumbnails': {}}
+        def fake_execute(request):
+            if request == 'videos':
+                raise Exception('quotaExceeded')
+            return {'items': [{'id': {'videoId': 'abc'}, 'snippet': snippet}]}
+        client._execute = fake_execute
+        
+        mock_prefs = Mock()
+        mock_prefs.get_preferences.return_value = {}
+        engine = PersonalizedSearchEngine(client, mock_prefs)
+        
+        videos = engine._get_raw_results('python', 10)
+        assert videos and 'view_count' not in videos[0]
+        response_cache.set.assert_not_called()
+        assert len(engine._search_cache) == 0
+        
+        # A video deleted between the search and statistics calls is not a failure
+        client._execute = lambda request: {'items': []} if request == 'videos' else \
+            {'items': [{'id': {'videoId': 'abc'}, 'snippet': snippet}]}
+        videos = engine._get_raw_results('python', 10)
+        assert videos and 'view_count' not in videos[0]
+        response_cache.set.assert_called_once()
+        assert len(engine._search_cache) == 1
+    
+    def test_http_connections_reused_across_threads(self):
+        """Test that API requests from different threads share pooled connections"""
+        import threading
+        from youtube_api import YouTubeSearchClient
+        from unittest.mock import Mock
+        
+        client = YouTubeSearchClient('dummy')
+        connections = []
+        request = Mock()
+        request.execute.side_effect = lambda http: connections.append(http)
+        
+        for _ in range(3):
+            worker = threading.Thread(target=client._execute, args=(request,))
+            worker.start()
+            worker.join()
+        
+        assert len(connections) == 3
+        assert len(set(map(id, connections))) == 1
+    
+    def test_search_by_channel_uses_channel_id(self):
+        """Test that channel searches resolve the channel once and filter server-side"""
+        from search_engine import PersonalizedSearchEngine
+        from unittest.mock import Mock
+        
+        mock_youtube = Mock()
+        mock_youtube.get_channel_id.return_value = 'UC123'
+        mock_youtube.search_videos.return_value = [{'video_id': 'abc', 'title': 'Talk', 'duration': 'PT5M'}]
+        mock_prefs = Mock()
+        mock_prefs.get_preferences.return_value = {}
+        
+        engine = PersonalizedSearchEngine(mock_youtube, mock_prefs, enable_caching=False)
+        engine.search_by_channel('SomeChannel')
+        results = engine.search_by_channel('SomeChannel')
+        
+        assert [video['video_id'] for video in results] == ['abc']
+        assert mock_youtube.get_channel_id.call_count == 1
+        assert mock_youtube.search_videos.call_args.kwargs['channel_id'] == 'UC123'
+    
+    def test_batch_scores_match_scalar_scores(self):
+        """Test that vectorized scoring agrees with per-video scoring"""
+        from search_engine import PersonalizedSearchEngine
+        from unittest.mock import Mock
+        import numpy as np
+        
+        engine = PersonalizedSearchEngine(Mock(), Mock())
+        context = engine._build_search_context(
+            {'preferred_channels': ['Dev'], 'preferred_keywords': ['python']},
+            'python tutorial'
+        )
+        videos = [
+            {'video_id': str(i), 'title': f'Python video {i}', 'channel': 'Dev' if i % 3 else 'Other',
+             'duration': f'PT{i}M', 'view_count': i * 1000, 'like_count': i * 10,
+             'published_at': '2024-01-01T00:00:00Z'}
+            for i in range(30)
+        ]
+        
+        batch_scores = engine._score_batch(videos, context)
+        scalar_scores = [engine._calculate_preference_score(video, context) for video in videos]
+        
+        assert np.allclose(batch_scores, scalar_scores)
+    
+    def test_keyword_matcher(self):
+        """Test multi-keyword matching across title and description"""
+        from keyword_matcher import KeywordMatcher
+        
+        matcher = KeywordMatcher(['Python', 'python tutorial', 'rust'])
+        assert matcher.find('learn python tutorial', 'no match') == {'python', 'python tutorial'}
+        assert matcher.matches_any('intro', 'rust basics')
+        assert matcher.count('nothing here') == 0
+        assert not KeywordMatcher([])
+        
+        # The search engine builds each keyword set's automaton once and reuses it
+        from search_engine import PersonalizedSearchEngine
+        from unittest.mock import Mock
+        
+        engine = PersonalizedSearchEngine(Mock(), Mock())
+        preferences = {'preferred_keywords': ['python'], 'disliked_keywords': ['spam']}
+        first = engine._build_search_context(preferences, 'one')
+        second = engine._build_search_context(dict(preferences), 'two')
+        assert first['preferred_matcher'] is second['preferred_matcher']
+        assert first['disliked_matcher'] is second['disliked_matcher']
+    
+    def test_recommendations_fan_out(self):
+        """Test that recommendation queries are merged in query order without duplicates"""
+        from search_engine import PersonalizedSearchEngine
+        from unittest.mock import Mock
+        
+        def fake_search(query, max_results, order, fields, channel_id=None):
+            return [{'video_id': f'{query}-{i}', 'title': query, 'duration': 'PT5M'} for i in range(2)] + \
+                   [{'video_id': 'shared', 'title': query, 'duration': 'PT5M'}]
+        
+        mock_youtube = Mock()
+        mock_youtube.search_videos.side_effect = fake_search
+        mock_prefs = Mock()
+        mock_prefs.get_preferences.return_value = {}
+        
+        engine = PersonalizedSearchEngine(mock_youtube, mock_prefs)
+        results = engine.get_recommendations(max_results=20)
+        video_ids = [video['video_id'] for video in results]
+        
+        assert len(video_ids) == len(set(video_ids))
+        assert video_ids[0].startswith('educational')
+        assert mock_youtube.search_videos.call_count == 4
+        
+        # Repeat calls are cached until any filtering preference changes
+        assert engine.get_recommendations(max_results=20) == results
+        mock_prefs.get_preferences.return_value = {'exclude_channels': ['Spam']}
+        engine.get_recommendations(max_results=20)
+        assert len(engine._recommendation_cache) == 2
+    
+    def test_failed_recommendations_not_cached(self):
+        """Test that recommendations are not cached when a fan-out query fails"""
+        from search_engine import PersonalizedSearchEngine
+        from unittest.mock import Mock
+        
+        mock_youtube = Mock()
+        mock_youtube.search_videos.side_effect = Exception('quotaExceeded')
+        mock_prefs = Mock()
+        mock_prefs.get_preferences.return_value = {}
+        
+        engine = PersonalizedSearchEngine(mock_youtube, mock_prefs)
+        assert engine.get_recommendations(max_results=20) == []
+        assert len(engine._recommendation_cache) == 0
+        
+        # The next call searches again once the API recovers
+        mock_youtube.search_videos.side_effect = None
+        mock_youtube.search_videos.return_value = [{'video_id': 'abc', 'title': 'Video', 'duration': 'PT5M'}]
+        assert [video['video_id'] for video in engine.get_recommendations(max_results=20)] == ['abc']
+        assert len(engine._recommendation_cache) == 1
+    
+    def test_query_relevance_counts_each_word(self):
+        """Test that the compiled query scan counts words like per-word substring checks"""
+        from search_engine import PersonalizedSearchEngine
+        from unittest.mock import Mock
+        
+        engine = PersonalizedSearchEngine(Mock(), Mock())
+        
+        for query, title in [('py python python', 'Python basics'), ('py python', 'pyx'),
+                             ('thon python c++', 'Learn C++ and Python'), ('rust', 'Go tutorial')]:
+            context = engine._build_search_context({}, query)
+            words = query.casefold().split()
+            expected = 1.0 + sum(word in title.casefold() for word in words) / len(words) * 2.0
+            assert engine._text_score({'title': title}, context) == expected
+    
+    def test_top_k_ranking_matches_full_sort(self):
+        """Test that limited ranking returns the head of the full ranking"""
+        from search_engine import PersonalizedSearchEngine
+        from unittest.mock import Mock
+        
+        engine = PersonalizedSearchEngine(Mock(), Mock())
+        context = engine._build_search_context({'preferred_channels': ['Dev']}, 'video')
+        
+        for count in (10, 40):
+            # Many equal scores exercise tie handling at the cutoff
+            videos = [{'video_id': str(i), 'title': 'video', 'channel': 'Dev' if i % 4 == 0 else 'Other',
+                       'duration': 'PT5M'} for i in range(count)]
+            full_ranking = engine._rank_videos(videos, context)
+            
+            for limit in (1, 5, count - 1):
+                assert engine._rank_videos(videos, context, limit=limit) == full_ranking[:limit]
+    
+    def test_search_videos_pages_beyond_fifty_results(self):
+        """Test that large searches page through results and attach statistics to every page"""
+        from youtube_api import YouTubeSearchClient
+        from unittest.mock import Mock
+        
+        client = YouTubeSearchClient('dummy')
+        client.youtube = Mock()
+        client.youtube.search.return_value.list.side_effect = lambda **params: ('search', params)
+        client.youtube.videos.return_value.list.side_effect = lambda **params: ('videos', params)
+        
+        def fake_execute(request):
+            kind, params = request
+            if kind == 'videos':
+                return {'items': [{'id': video_id, 'statistics': {'viewCount': '7'},
+                                   'contentDetails': {'duration': 'PT1M'}}
+                                  for video_id in params['id'].split(',')]}
+            
+            start = int(params.get('pageToken', 0))
+            snippet = {'title': 't', 'channelTitle': 'c', 'description': 'd',
+                       'publishedAt': '2024-01-01T00:00:00Z', 'thumbnails': {}}
+            return {'items': [{'id': {'videoId': str(i)}, 'snippet': snippet}
+                              for i in range(start, start + params['maxResults'])],
+                    'nextPageToken': str(start + params['maxResults'])}
+        
+        client._execute = fake_execute
+        videos = client.search_videos('python', max_results=120)
+        
+        assert [video['video_id'] for video in videos] == [str(i) for i in range(120)]
+        assert all(video['view_count'] == 7 for video in videos)
+        
+        page_sizes = [call.kwargs['maxResults'] for call in client.youtube.search.return_value.list.call_args_list]
+        assert page_sizes == [50, 50, 20]
 
 if __name__ == '__main__':
     pytest.main([__file__])
\ No newline at end of file